@@ -0,0 +1,374 @@
+import abc
+import asyncio
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import preprocessing
+
+# Values of each feature in the quote forms, as written in the input datasets (before preprocessing)
+FEATURE_VALUES = {
+    'gender': ['M', 'F'],
+    'age': ['25', '32'],
+    'birthplace': ['Milan', 'Rome', 'Naples', 'China', 'Morocco'],
+    'marital_status': ['Married', 'Single', 'Widow'],
+    'education': ['Master', 'Without a qualification'],
+    'profession': ['Looking for a job', 'Employee'],
+    'car': ['NSEP', 'OLED'],
+    'km_driven': ['10000', '30000'],
+    'city': ['Milan', 'Naples'],
+    'class': ['1', '4', '9', '18'],
+}
+# Price columns returned by each insurer, as written in the input datasets (preprocessing renames the C1 ones)
+INSURER_COLUMNS = {
+    'C1': ['C9', 'C1/a', 'C1/b', 'C1/c'],
+    'C2': ['C2/a', 'C2/b', 'C2/c'],
+    'C3': ['C3/a', 'C3/b', 'C3/c', 'C3/d'],
+    'C4': ['C4/a'],
+    'C5': ['C5/a', 'C5/b'],
+    'C6': ['C6/a'],
+}
+INPUT_FEATURES = list(FEATURE_VALUES)
+INPUT_COLUMNS = INPUT_FEATURES + [column for columns in INSURER_COLUMNS.values() for column in columns]
+INPUT_DTYPES = {'age': 'str', 'class': 'str', 'km_driven': 'str'}
+# Price columns after preprocessing (C9 renamed to C1/a and the other C1 columns shifted), as column_prices in main.py
+PREPROCESSED_PRICE_COLUMNS = ['C1/a', 'C1/b', 'C1/c', 'C1/d'] + [column for insurer, columns in INSURER_COLUMNS.items() if insurer != 'C1' for column in columns]
+
+
+def profile_grid(features, feature_values=None):
+    """
+    Generate all the profiles obtained by combining the values of the given features.
+
+    Parameters:
+    - features (list): The features to combine, in the order they vary (the last one varies fastest).
+    - feature_values (dict, optional): The values of each feature. Default is FEATURE_VALUES.
+
+    Returns:
+    - generator: One dict {feature: value} per profile.
+    """
+    if feature_values is None:
+        feature_values = FEATURE_VALUES
+    for values in itertools.product(*(feature_values[feature] for feature in features)):
+        yield dict(zip(features, values))
+
+
+class RateLimiter:
+    """
+    Space the calls to wait() so that at most `rate` of them start per second.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+class QuoteBackend(abc.ABC):
+    """
+    Base class of the backends queried for the quotes of one insurer.
+
+    Subclasses implement quote(), returning the prices of the insurer for a profile as a dict
+    {column: price}, with None (or a missing column) when the service is not quoted. Any exception
+    raised by quote() is treated as a transient failure and the query is retried.
+
+    Parameters:
+    - insurer (str): The insurer name, a key of INSURER_COLUMNS (e.g. 'C2').
+    - rate (float, optional): The maximum number of queries per second to this insurer. Default is None (no limit).
+    """
+
+    def __init__(self, insurer, rate=None):
+        self.insurer = insurer
+        self.columns = INSURER_COLUMNS[insurer]
+        self.limiter = RateLimiter(rate)
+
+    @abc.abstractmethod
+    async def quote(self, profile):
+        pass
+
+
+class HTTPBackend(QuoteBackend):
+    """
+    Query the quotes of an insurer from a JSON HTTP endpoint.
+
+    The endpoint receives a POST with {"insurer": ..., "profile": {...}} and answers with
+    {"quotes": {column: price or null}}. Error statuses raise and are retried by the collector.
+
+    Parameters:
+    - insurer (str): The insurer name, a key of INSURER_COLUMNS.
+    - url (str): The endpoint URL.
+    - rate (float, optional): The maximum number of queries per second. Default is None (no limit).
+    - timeout (float, optional): The timeout of each query in seconds. Default is 30.
+    """
+
+    def __init__(self, insurer, url, rate=None, timeout=30):
+        super().__init__(insurer, rate)
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, profile):
+        body = json.dumps({'insurer': self.insurer, 'profile': profile}).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())['quotes']
+
+    async def quote(self, profile):
+        # urllib is blocking, run it in a thread so that the queries overlap
+        return await asyncio.to_thread(self._post, profile)
+
+
+class MockQuoteServer:
+    """
+    A local HTTP server answering like the endpoint expected by HTTPBackend, to test the collection.
+
+    Prices are a deterministic function of the insurer and the profile, so repeated collections give
+    the same dataset. Use it as an async context manager:
+
+        async with MockQuoteServer(failure_rate=0.1) as server:
+            backends = [HTTPBackend(insurer, server.url) for insurer in INSURER_COLUMNS]
+
+    Parameters:
+    - host (str, optional): The interface to listen on. Default is '127.0.0.1'.
+    - port (int, optional): The port to listen on. Default is 0 (any free port).
+    - failure_rate (float, optional): The fraction of requests answered with a 503 error. Default is 0.
+    - latency (float, optional): The delay before each answer in seconds. Default is 0.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, failure_rate=0, latency=0):
+        self.host = host
+        self.port = port
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.requests = 0
+        self._server = None
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}/quote'
+
+    @staticmethod
+    def prices(insurer, profile):
+        seed = hashlib.sha256(json.dumps([insurer, profile], sort_keys=True).encode('utf-8')).digest()
+        rng = random.Random(seed)
+        base = rng.uniform(150, 1500)
+        return {column: round(base * rng.uniform(0.9, 1.2), 2) if rng.random() < 0.8 else None for column in INSURER_COLUMNS[insurer]}
+
+    async def _handle(self, reader, writer):
+        try:
+            headers = {}
+            await reader.readline()
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            request = json.loads(await reader.readexactly(int(headers.get('content-length', 0))))
+            self.requests += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if random.random() < self.failure_rate:
+                status, body = '503 Service Unavailable', b'{}'
+            else:
+                status, body = '200 OK', json.dumps({'quotes': self.prices(request['insurer'], request['profile'])}).encode('utf-8')
+            writer.write(f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+class QuoteCollector:
+    """
+    Collect the quotes of several insurers for many profiles, with bounded concurrency, retries and
+    a resumable checkpoint.
+
+    Every collected profile is appended to the checkpoint file as a row of the input schema of
+    preprocessing (INPUT_COLUMNS, ';' separated), so the checkpoint can be read like the files in data/.
+    Profiles already in the checkpoint are skipped, so an interrupted collection resumes where it stopped.
+    Profiles whose queries keep failing are not written, and are retried by the next run.
+
+    Parameters:
+    - backends (list): The QuoteBackend to query for each profile, one per insurer.
+    - checkpoint_path (str): The CSV file the collected rows are appended to.
+    - concurrency (int, optional): The maximum number of profiles queried at the same time. Default is 8.
+    - retries (int, optional): The number of retries of a failed query. Default is 3.
+    - backoff (float, optional): The delay before the first retry in seconds, doubled at each retry. Default is 1.
+    - debug (bool, optional): Whether to print the failed queries. Default is False.
+    """
+
+    def __init__(self, backends, checkpoint_path, concurrency=8, retries=3, backoff=1, debug=False):
+        self.backends = backends
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.debug = debug
+        self.failed = []
+
+    def completed_profiles(self):
+        """
+        Return the keys (tuples of the INPUT_FEATURES values) of the profiles already in the checkpoint.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, newline='', encoding='utf-8') as f:
+            return {tuple(row[feature] for feature in INPUT_FEATURES) for row in csv.DictReader(f, delimiter=';')}
+
+    async def _quote(self, backend, profile):
+        for attempt in range(self.retries + 1):
+            await backend.limiter.wait()
+            try:
+                return await backend.quote(profile)
+            except Exception as e:
+                if self.debug:
+                    print(f'[QuoteCollector][{backend.insurer}] attempt {attempt + 1} failed: {e!r}')
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def _collect_profile(self, profile):
+        # If one insurer keeps failing, the queries to the other insurers are cancelled
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(self._quote(backend, profile)) for backend in self.backends]
+        quotes = [task.result() for task in tasks]
+        row = {column: '' for column in INPUT_COLUMNS}
+        row.update(profile)
+        for backend, prices in zip(self.backends, quotes):
+            for column in backend.columns:
+                price = prices.get(column)
+                row[column] = '' if price is None else f'{price:.2f}'
+        return row
+
+    async def collect(self, profiles):
+        """
+        Query the profiles not yet in the checkpoint and yield their rows as soon as they are collected.
+
+        Parameters:
+        - profiles (iterable): The profiles to query, as dicts with all the INPUT_FEATURES.
+
+        Returns:
+        - async generator: One dict {column: value} per collected profile, values formatted as in data/.
+        """
+        done = self.completed_profiles()
+        todo = []
+        for profile in profiles:
+            key = tuple(profile[feature] for feature in INPUT_FEATURES)
+            if key not in done:
+                done.add(key)
+                todo.append(profile)
+        queue = asyncio.Queue()
+        for profile in todo:
+            queue.put_nowait(profile)
+        results = asyncio.Queue()
+
+        async def worker():
+            while not queue.empty():
+                profile = queue.get_nowait()
+                try:
+                    await results.put(await self._collect_profile(profile))
+                except Exception:
+                    self.failed.append(profile)
+                    await results.put(None)
+
+        write_header = not os.path.exists(self.checkpoint_path) or os.path.getsize(self.checkpoint_path) == 0
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(todo)))]
+        try:
+            with open(self.checkpoint_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=INPUT_COLUMNS, delimiter=';', lineterminator='\n')
+                if write_header:
+                    writer.writeheader()
+                for _ in range(len(todo)):
+                    row = await results.get()
+                    if row is None:
+                        continue
+                    writer.writerow(row)
+                    f.flush()
+                    yield row
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def collect_dataframe(self, profiles, column_prices, features, batch_size=500):
+        """
+        Collect the profiles and preprocess them while the collection goes on.
+
+        The rows already in the checkpoint and every `batch_size` new rows are passed to
+        preprocessing.preprocess in a background thread, one batch at a time. Since preprocess writes
+        each batch to debug/top_data.csv, the file is rewritten with the whole DataFrame at the end.
+
+        Parameters:
+        - profiles (iterable): The profiles to query, as dicts with all the INPUT_FEATURES.
+        - column_prices (list): The price columns, as passed to preprocessing.preprocess.
+        - features (list): The features, as passed to preprocessing.preprocess.
+        - batch_size (int, optional): The number of rows preprocessed together. Default is 500.
+
+        Returns:
+        - pandas.DataFrame: The preprocessed DataFrame of all the profiles in the checkpoint.
+        """
+        loop = asyncio.get_running_loop()
+        os.makedirs('debug', exist_ok=True)
+        # A single thread: preprocess writes a debug file, and batches must not run concurrently
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = []
+            if os.path.exists(self.checkpoint_path) and os.path.getsize(self.checkpoint_path) > 0:
+                df = pd.read_csv(self.checkpoint_path, sep=';', dtype=INPUT_DTYPES)
+                if not df.empty:
+                    pending.append(loop.run_in_executor(executor, preprocessing.preprocess, df, column_prices, features))
+            batch = []
+            async for row in self.collect(profiles):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    pending.append(loop.run_in_executor(executor, preprocessing.preprocess, _rows_to_dataframe(batch), column_prices, features))
+                    batch = []
+            if batch:
+                pending.append(loop.run_in_executor(executor, preprocessing.preprocess, _rows_to_dataframe(batch), column_prices, features))
+            frames = await asyncio.gather(*pending)
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df['class'] = pd.Categorical(df['class'], ["1", "4", "9", "18"])
+        df.to_csv('debug/top_data.csv', sep=';', index=False)
+        return df
+
+
+def _rows_to_dataframe(rows):
+    """
+    Build a DataFrame from collected rows, with the same dtypes as reading the input CSV files.
+    """
+    df = pd.DataFrame(rows, columns=INPUT_COLUMNS)
+    price_columns = INPUT_COLUMNS[len(INPUT_FEATURES):]
+    df[price_columns] = df[price_columns].apply(pd.to_numeric)
+    return df
+
+
+async def _demo(checkpoint_path='debug/collected_mock.csv'):
+    os.makedirs('debug', exist_ok=True)
+    async with MockQuoteServer(failure_rate=0.05) as server:
+        backends = [HTTPBackend(insurer, server.url, rate=200) for insurer in INSURER_COLUMNS]
+        collector = QuoteCollector(backends, checkpoint_path, concurrency=16, backoff=0.1)
+        df = await collector.collect_dataframe(profile_grid(INPUT_FEATURES), PREPROCESSED_PRICE_COLUMNS, INPUT_FEATURES)
+    print(f'{df.shape[0]} profiles collected, {len(collector.failed)} failed, {server.requests} requests.')
+
+
+if __name__ == '__main__':
+    # Collect the full profile grid from a local mock quote server
+    asyncio.run(_demo())
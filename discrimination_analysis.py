@@ -2,10 +2,11 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 from statsmodels.stats.descriptivestats import sign_test
+import results
 
-def compute_distribution(df, column, attribute_description=None, pairs_description=None, quartiles=False, numeric=False, debug=False):
+def distribution_record(df, column, attribute_description=None, pairs_description=None, debug=False):
     """
-    Compute the distribution of a given column in a DataFrame.
+    Compute the numeric summary of the distribution of a given column in a DataFrame.
     From statsmodels.stats.descriptivestats.sign_test:
         The signs test returns M = (N(+) - N(-))/2
         where N(+) is the number of values above mu0, N(-) is the number of values below. Values equal to mu0 are discarded.
@@ -17,91 +18,70 @@ def compute_distribution(df, column, attribute_description=None, pairs_descripti
     - column (str): The name of the column to compute the distribution for.
     - attribute_description (str, optional): Description of the attribute. Default is None.
     - pairs_description (str, optional): Description of the pairs. Default is None.
-    - quartiles (bool, optional): Whether to compute the quartiles. Default is False.
-    - numeric (bool, optional): Whether the column is numeric. Default is False.
     - debug (bool, optional): Whether to print debug information. Default is False.
 
     Returns:
-    - results_df (pandas.DataFrame): A DataFrame containing the computed distribution. The columns are: 'Attribute', 'Pairs', 'Ties5', '.05()', '.50()', '.95()', 'm()' (quartiles = False) or 'Attribute', 'Pairs', 'Ties5', '.05()', '.25()', '.50()', '.75()', '.95()', 'm()' (quartiles = True).
+    - record (results.DistributionRecord): The computed distribution.
 
     """
-    median = df[column].median()
-    average = df[column].mean()
-    quantile_5th = df[column].quantile(0.05)
-    quantile_25th = df[column].quantile(0.25)
-    quantile_75th = df[column].quantile(0.75)
-    quantile_95th = df[column].quantile(0.95)
-    M, p_value = sign_test(df[column], mu0=0)
+    values = df[column].to_numpy(dtype=float)
+    # Same as pandas.Series.quantile: NaN are skipped and linear interpolation is used
+    if np.isnan(values).all():
+        quantiles = np.full(5, np.nan)
+        average = np.nan
+    else:
+        quantiles = np.nanquantile(values, [0.05, 0.25, 0.5, 0.75, 0.95])
+        average = np.nanmean(values)
+    M, p_value = sign_test(values, mu0=0)
     if debug:
         print(f'[compute_distribution][column:{column}] M: {M}, p-value: {p_value}')
-    
 
     # Compute the percentage of '{column}_diff' values between -5 and +5
-    ties5 = (df[(df[column] >= -5) & (df[column] <= 5)].shape[0] / df.shape[0]) * 100
+    ties5 = (np.count_nonzero((values >= -5) & (values <= 5)) / values.shape[0]) * 100 if values.shape[0] else np.nan
 
     if attribute_description is None:
         attribute_description = ''
     if pairs_description is None:
         pairs_description = ''
-    
-    alpha = 0.05
+
     # bonferroni_divisor = 9 
-    # alpha_corrected = alpha / bonferroni_divisor
+    # alpha_corrected = results.ALPHA / bonferroni_divisor
 
-    if p_value < alpha:
-        p_value_str = f'\\textbf{{<{alpha:.2f}}}'
-    else:
-        p_value_str = f'{p_value:.2f}'
-
-    # Create a dataframe with the results
-    if numeric and quartiles:
-        results_df = pd.DataFrame({
-            'Attribute': attribute_description,
-            'Pairs': pairs_description,
-            'Ties5': ties5,
-            '.05()': quantile_5th,
-            '.25()': quantile_25th,
-            '.50()': median,
-            '.75()': quantile_75th,
-            '.95()': quantile_95th,
-            'm()': average,
-            'p-value': p_value_str
-        }, index=[0])
-    elif numeric and not quartiles:
-        results_df = pd.DataFrame({
-            'Attribute': attribute_description,
-            'Pairs': pairs_description,
-            'Ties5': ties5,
-            '.05()': quantile_5th,
-            '.50()': median,
-            '.95()': quantile_95th,
-            'm()': average,
-            'p-value': p_value_str
-        }, index=[0])
-    elif not numeric and quartiles:
-        results_df = pd.DataFrame({
-            'Attribute': attribute_description,
-            'Pairs': pairs_description,
-            'Ties5': f'{ties5:.0f}\\%',
-            '.05()': f'{quantile_5th:.0f} €',
-            '.25()': f'{quantile_25th:.0f} €',
-            '.50()': f'{median:.0f} €',
-            '.75()': f'{quantile_75th:.0f} €',
-            '.95()': f'{quantile_95th:.0f} €',
-            'm()': f'{average:.0f} €',
-            'p-value': p_value_str
-        }, index=[0])
-    else:
-        results_df = pd.DataFrame({
-            'Attribute': attribute_description,
-            'Pairs': pairs_description,
-            'Ties5': f'{ties5:.0f}\\%',
-            '.05()': f'{quantile_5th:.0f} €',
-            '.50()': f'{median:.0f} €',
-            '.95()': f'{quantile_95th:.0f} €',
-            'm()': f'{average:.0f} €',
-            'p-value': p_value_str
-        }, index=[0])
+    return results.DistributionRecord(
+        attribute=attribute_description,
+        pairs=pairs_description,
+        n=int(values.shape[0]),
+        ties5=float(ties5),
+        q05=float(quantiles[0]),
+        q25=float(quantiles[1]),
+        q50=float(quantiles[2]),
+        q75=float(quantiles[3]),
+        q95=float(quantiles[4]),
+        mean=float(average),
+        sign_m=float(M),
+        p_value=float(p_value),
+    )
+
+def compute_distribution(df, column, attribute_description=None, pairs_description=None, quartiles=False, numeric=False, debug=False):
+    """
+    Compute the distribution of a given column in a DataFrame, as a one-row DataFrame.
+    See distribution_record for the statistics; prefer it when collecting many comparisons.
+
+    Parameters:
+    - df (pandas.DataFrame): The DataFrame containing the data.
+    - column (str): The name of the column to compute the distribution for.
+    - attribute_description (str, optional): Description of the attribute. Default is None.
+    - pairs_description (str, optional): Description of the pairs. Default is None.
+    - quartiles (bool, optional): Whether to compute the quartiles. Default is False.
+    - numeric (bool, optional): Whether to keep the values numeric instead of formatting them for LaTeX. Default is False.
+    - debug (bool, optional): Whether to print debug information. Default is False.
+
+    Returns:
+    - results_df (pandas.DataFrame): A DataFrame containing the computed distribution. The columns are: 'Attribute', 'Pairs', 'Ties5', '.05()', '.50()', '.95()', 'm()', 'p-value' (quartiles = False) or 'Attribute', 'Pairs', 'Ties5', '.05()', '.25()', '.50()', '.75()', '.95()', 'm()', 'p-value' (quartiles = True).
+
+    """
+    record = distribution_record(df, column, attribute_description, pairs_description, debug=debug)
+    results_df = results.DistributionResults([record]).to_dataframe(quartiles=quartiles, formatted=not numeric)
 
     return results_df
 
@@ -128,13 +108,11 @@ def differences_distribution(df, column, test_value, baseline_value, diff_column
         baseline_value: The value representing the baseline group.
         diff_column (str): The column name containing the values to compare.
         quartiles (bool, optional): Whether to compute the quartiles. Defaults to False.
+        numeric (bool, optional): Whether to keep the values numeric instead of formatting them for LaTeX. Defaults to False.
         debug (bool, optional): Whether to print debug information. Defaults to False.
 
     Returns:
-        pandas.DataFrame: A DataFrame containing the distribution of differences.
-
-    Raises:
-        None
+        pandas.DataFrame: A one-row DataFrame containing the distribution of differences.
 
     Examples:
         >>> df = pd.DataFrame({'gender': ['Male', 'Female', 'Male', 'Female'],
@@ -142,6 +120,25 @@ def differences_distribution(df, column, test_value, baseline_value, diff_column
         ...                    'income': [50000, 60000, 55000, 65000]})
         >>> differences_distribution(df, 'gender', 'Male', 'Female', 'income')
         
+    """
+    record = differences_record(df, column, test_value, baseline_value, diff_column, debug=debug)
+    return results.DistributionResults([record]).to_dataframe(quartiles=quartiles, formatted=not numeric)
+
+def differences_record(df, column, test_value, baseline_value, diff_column, debug=False):
+    """
+    Compute the distribution of differences between two groups in a DataFrame, as a numeric record.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame.
+        column (str): The column name used to define the groups.
+        test_value: The value representing the test group.
+        baseline_value: The value representing the baseline group.
+        diff_column (str): The column name containing the values to compare.
+        debug (bool, optional): Whether to print debug information. Defaults to False.
+
+    Returns:
+        results.DistributionRecord: The distribution of differences.
+
     """
     columns=['gender', 'birthplace', 'age', 'city', 'marital_status', 'education', 'profession', 'car', 'km_driven', 'class', diff_column]
     columns_features = columns.copy()
@@ -163,7 +160,7 @@ def differences_distribution(df, column, test_value, baseline_value, diff_column
         df_sorted = df_merged.sort_values(by=f'{diff_column}_diff')
         df_sorted.to_csv(f'debug/2_merged_data_{column}_{test_value}vs{baseline_value}.csv', sep=';', index=False)
     
-    results_df = compute_distribution(df_merged, f'{diff_column}_diff', column, f'{test_value} vs {baseline_value}', quartiles=quartiles, numeric=numeric, debug=debug)
+    record = distribution_record(df_merged, f'{diff_column}_diff', column, f'{test_value} vs {baseline_value}', debug=debug)
     
     # TODO: Perform t-test on the differences
     # https://stackoverflow.com/questions/59694680/how-do-i-perform-a-t-test-from-a-dataframe
@@ -174,7 +171,7 @@ def differences_distribution(df, column, test_value, baseline_value, diff_column
     # print(df_merged.head())
     # print(stats.ttest_ind(df_merged[f'{diff_column}'].to_numpy(),df_merged[f'{diff_column}_test'].to_numpy()))
 
-    return results_df
+    return record
 
 def control_pairs(df_original, df_cp, features, column_name, quartiles=False, numeric=False, debug=False):
     """
@@ -182,15 +179,33 @@ def control_pairs(df_original, df_cp, features, column_name, quartiles=False, nu
 
     Args:
         df (DataFrame): The input DataFrame.
+        df_cp (DataFrame): The control queries DataFrame.
         features (list): List of column names to consider for identifying duplicates.
         column_name (str, optional): The column name to compute the difference for. Defaults to 'top1'.
         quartiles (bool, optional): Whether to compute the quartiles. Defaults to False.
-        numeric (bool, optional): Whether the column is numeric. Defaults to False.
+        numeric (bool, optional): Whether to keep the values numeric instead of formatting them for LaTeX. Defaults to False.
         debug (bool, optional): Whether to print debug information. Defaults to False.
 
     Returns:
         DataFrame: The computed control pairs.
 
+    """
+    record = control_pairs_record(df_original, df_cp, features, column_name, debug=debug)
+    return results.DistributionResults([record]).to_dataframe(quartiles=quartiles, formatted=not numeric)
+
+def control_pairs_record(df_original, df_cp, features, column_name, debug=False):
+    """
+    Compute control pairs for a given DataFrame, as a numeric record.
+
+    Args:
+        df (DataFrame): The input DataFrame.
+        features (list): List of column names to consider for identifying duplicates.
+        column_name (str, optional): The column name to compute the difference for. Defaults to 'top1'.
+        debug (bool, optional): Whether to print debug information. Defaults to False.
+
+    Returns:
+        results.DistributionRecord: The computed control pairs.
+
     """
     # Use the original Dataframe, find duplicates, and use them as control pairs
     # df = df_original.copy()
@@ -212,10 +227,33 @@ def control_pairs(df_original, df_cp, features, column_name, quartiles=False, nu
     df = df_original.copy()
     df = df.merge(df_cp, how='inner', on=features, suffixes=('', '_cp'))
     df[f'{column_name}_diff'] = df[f'{column_name}_cp'] - df[column_name]
-    cp = compute_distribution(df, f'{column_name}_diff', 'control pairs', quartiles=quartiles, numeric=numeric)
+    cp = distribution_record(df, f'{column_name}_diff', 'control pairs')
 
     if debug:
         print(f'#control_pairs: {df.shape[0]}')
         df.to_csv(f'debug/2_control_pairs_{column_name}.csv', sep=';', index=False)
     
-    return cp
\ No newline at end of file
+    return cp
+
+def discrimination_results(df, df_cp, features, comparisons, diff_column, debug=False):
+    """
+    Compute the distribution of differences for several comparisons, followed by the control pairs.
+
+    Args:
+        df (DataFrame): The input DataFrame.
+        df_cp (DataFrame): The control queries DataFrame, or None to skip the control pairs.
+        features (list): List of column names identifying a profile.
+        comparisons (list): The (column, test_value, baseline_value) tuples to compare.
+        diff_column (str): The column name containing the values to compare.
+        debug (bool, optional): Whether to print debug information. Defaults to False.
+
+    Returns:
+        results.DistributionResults: One record per comparison, in order, then the control pairs.
+
+    """
+    records = results.DistributionResults()
+    for column, test_value, baseline_value in comparisons:
+        records.append(differences_record(df, column, test_value, baseline_value, diff_column, debug=debug))
+    if df_cp is not None:
+        records.append(control_pairs_record(df, df_cp, features, diff_column, debug=debug))
+    return records
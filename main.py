@@ -39,6 +39,27 @@ column_prices = ['C1/a', 'C1/b', 'C1/c', 'C1/d', 'C2/a', 'C2/b', 'C2/c', 'C3/a',
 output_variability_companies_a = ['C1/a', 'C2/a', 'C3/a', 'C4/a', 'C5/a', 'C6/a']
 output_variability_companies_any = ['C1', 'C2', 'C3', 'C4', 'C5', 'C6']
 output_variability_companies_any_meaningful = ['C2', 'C3', 'C4', 'C6']
+# RQ2 comparisons as (attribute, test value, baseline value)
+rq2_comparisons = [
+    ('gender', 'F', 'M'),
+    ('birthplace', 'RO', 'MI'),
+    ('birthplace', 'NA', 'MI'),
+    ('birthplace', 'MA', 'MI'),
+    ('birthplace', 'CN', 'MI'),
+    ('age', '25', '32'),
+    ('city', 'NA', 'MI'),
+    # ('profession', 'Emp', 'LfaJ'),
+    # ('education', 'MSc', 'WaQ'),
+    # ('marital_status', 'Sin', 'Wid'),
+    ('marital_status', 'Sin', 'Mar'),
+    ('marital_status', 'Wid', 'Mar'),
+    ('education', 'WaQ', 'MSc'),
+    ('profession', 'LfaJ', 'Emp'),
+]
+# Comparisons shown in the boxplots, as (attribute, pairs)
+rq2_plot_keys = [(column, f'{test} vs {baseline}') for column, test, baseline in rq2_comparisons if (column, test) not in [('birthplace', 'RO'), ('marital_status', 'Sin')]] + [('control pairs', '')]
+# Attribute names used in the merged LaTeX table
+attribute_labels = {'birthplace': 'Birthplace', 'gender': 'Gender', 'profession': 'Profession', 'education': 'Education', 'marital_status': 'Mar. Stat.', 'age': 'Age', 'city': 'City', 'control pairs': 'Control pairs (noise)'}
 
 # Define the font size for the plot
 SMALL_SIZE = 8
@@ -86,66 +107,21 @@ print("top1&top5 boxplots stacked")
 plotting.rq1_topm_topn(df, df, features, column1='top1', column2='top5avg', ylabel1='Top 1', ylabel2='Top 5')
 
 print("rq2 discrimination analysis - top1")
-gd_fem = discrimination_analysis.differences_distribution(df, 'gender', 'F', 'M', 'top1')
-bp_ro = discrimination_analysis.differences_distribution(df, 'birthplace', 'RO', 'MI', 'top1')
-bp_na = discrimination_analysis.differences_distribution(df, 'birthplace', 'NA', 'MI', 'top1')
-bp_ma = discrimination_analysis.differences_distribution(df, 'birthplace', 'MA', 'MI', 'top1')
-bp_cn = discrimination_analysis.differences_distribution(df, 'birthplace', 'CN', 'MI', 'top1')
-age = discrimination_analysis.differences_distribution(df, 'age', '25', '32', 'top1')
-city = discrimination_analysis.differences_distribution(df, 'city', 'NA', 'MI', 'top1')
-# pr_emp = discrimination_analysis.differences_distribution(df, 'profession', 'Emp', 'LfaJ', 'top1')
-# ed_msc = discrimination_analysis.differences_distribution(df, 'education', 'MSc', 'WaQ', 'top1')
-# ms_sin = discrimination_analysis.differences_distribution(df, 'marital_status', 'Sin', 'Wid', 'top1')
-ms_sin = discrimination_analysis.differences_distribution(df, 'marital_status', 'Sin', 'Mar', 'top1')
-ms_wid = discrimination_analysis.differences_distribution(df, 'marital_status', 'Wid', 'Mar', 'top1')
-ed_msc = discrimination_analysis.differences_distribution(df, 'education', 'WaQ', 'MSc', 'top1')
-pr_emp = discrimination_analysis.differences_distribution(df, 'profession', 'LfaJ', 'Emp', 'top1')
-
-# control pairs
-cp = discrimination_analysis.control_pairs(df, cp_df, features, 'top1')
-# Combine the dataframes
-rq2_top1_df = pd.concat([gd_fem, bp_ro, bp_na, bp_ma, bp_cn, age, city, ms_sin, ms_wid, ed_msc, pr_emp, cp], ignore_index=True)
-rq2_top1_df.to_latex("tables/rq2_discrimination_analysis_top1.tex", index=False, caption='Discrimination Analysis Results', label='table:discrimination_analysis')
-print(rq2_top1_df)
+rq2_top1 = discrimination_analysis.discrimination_results(df, cp_df, features, rq2_comparisons, 'top1')
+rq2_top1.render('latex', path="tables/rq2_discrimination_analysis_top1.tex", caption='Discrimination Analysis Results', label='table:discrimination_analysis')
+print(rq2_top1.render('markdown'))
 
 print("rq2 discrimination analysis - top5")
-gd_fem = discrimination_analysis.differences_distribution(df, 'gender', 'F', 'M', 'top5avg')
-bp_ro = discrimination_analysis.differences_distribution(df, 'birthplace', 'RO', 'MI', 'top5avg')
-bp_na = discrimination_analysis.differences_distribution(df, 'birthplace', 'NA', 'MI', 'top5avg')
-bp_ma = discrimination_analysis.differences_distribution(df, 'birthplace', 'MA', 'MI', 'top5avg')
-bp_cn = discrimination_analysis.differences_distribution(df, 'birthplace', 'CN', 'MI', 'top5avg')
-age = discrimination_analysis.differences_distribution(df, 'age', '25', '32', 'top5avg')
-city = discrimination_analysis.differences_distribution(df, 'city', 'NA', 'MI', 'top5avg')
-# pr_emp = discrimination_analysis.differences_distribution(df, 'profession', 'Emp', 'LfaJ', 'top5avg')
-# ed_msc = discrimination_analysis.differences_distribution(df, 'education', 'MSc', 'WaQ', 'top5avg')
-# ms_sin = discrimination_analysis.differences_distribution(df, 'marital_status', 'Sin', 'Wid', 'top5avg')
-ms_sin = discrimination_analysis.differences_distribution(df, 'marital_status', 'Sin', 'Mar', 'top5avg')
-ms_wid = discrimination_analysis.differences_distribution(df, 'marital_status', 'Wid', 'Mar', 'top5avg')
-ed_msc = discrimination_analysis.differences_distribution(df, 'education', 'WaQ', 'MSc', 'top5avg')
-pr_emp = discrimination_analysis.differences_distribution(df, 'profession', 'LfaJ', 'Emp', 'top5avg')
-# control pairs
-cp = discrimination_analysis.control_pairs(df, cp_df, features, 'top5avg')
-# Combine the dataframes
-rq2_top5_df = pd.concat([gd_fem, bp_ro, bp_na, bp_ma, bp_cn, age, city, ms_sin, ms_wid, ed_msc, pr_emp, cp], ignore_index=True)
-rq2_top5_df.to_latex("tables/rq2_discrimination_analysis_top5.tex", index=False, caption='Discrimination Analysis Results', label='table:discrimination_analysis')
-print(rq2_top5_df)
-# Merge rq2_top1_df and rq2_top5_df
-merged_df = pd.merge(rq2_top1_df, rq2_top5_df, on=['Attribute', 'Pairs'], suffixes=('_top1', '_top5'))
-merged_df. replace({'Attribute': {'birthplace': 'Birthplace', 'gender': 'Gender', 'profession': 'Profession', 'education': 'Education', 'marital_status': 'Mar. Stat.', 'age': 'Age', 'city': 'City', 'control pairs 1': '\\multicolumn{2}{l|}{Control pairs (noise) 1}', 'control pairs 2': '\\multicolumn{2}{l|}{Control pairs (noise) 2}', 'control pairs':'\\multicolumn{2}{l|}{Control pairs (noise)}'}}, inplace=True)
-merged_df.to_latex("tables/rq2_discrimination_analysis_merged.tex", index=False, caption='Discrimination Analysis Results', label='table:discrimination_analysis')
+rq2_top5 = discrimination_analysis.discrimination_results(df, cp_df, features, rq2_comparisons, 'top5avg')
+rq2_top5.render('latex', path="tables/rq2_discrimination_analysis_top5.tex", caption='Discrimination Analysis Results', label='table:discrimination_analysis')
+print(rq2_top5.render('markdown'))
+# Merge rq2_top1 and rq2_top5
+rq2_top1.render('latex', others=[rq2_top5], suffixes=['_top1', '_top5'], path="tables/rq2_discrimination_analysis_merged.tex", caption='Discrimination Analysis Results', label='table:discrimination_analysis', labels=attribute_labels, span_empty_pairs=True)
+# Numeric results for further processing
+rq2_top1.render('csv', others=[rq2_top5], suffixes=['_top1', '_top5'], quartiles=True, path="tables/rq2_discrimination_analysis_merged.csv")
 
 # Plot the discrimination analysis results
-gd_fem_q_n = discrimination_analysis.differences_distribution(df, 'gender', 'F', 'M', 'top5avg', quartiles=True, numeric=True)
-bp_na_q_n = discrimination_analysis.differences_distribution(df, 'birthplace', 'NA', 'MI', 'top5avg', quartiles=True, numeric=True)
-bp_ma_q_n = discrimination_analysis.differences_distribution(df, 'birthplace', 'MA', 'MI', 'top5avg', quartiles=True, numeric=True)
-bp_cn_q_n = discrimination_analysis.differences_distribution(df, 'birthplace', 'CN', 'MI', 'top5avg', quartiles=True, numeric=True)
-age_q_n = discrimination_analysis.differences_distribution(df, 'age', '25', '32', 'top5avg', quartiles=True, numeric=True)
-city_q_n = discrimination_analysis.differences_distribution(df, 'city', 'NA', 'MI', 'top5avg', quartiles=True, numeric=True)
-ms_wid_q_n = discrimination_analysis.differences_distribution(df, 'marital_status', 'Wid', 'Mar', 'top5avg', quartiles=True, numeric=True)
-ed_msc_q_n = discrimination_analysis.differences_distribution(df, 'education', 'WaQ', 'MSc', 'top5avg', quartiles=True, numeric=True)
-pr_emp_q_n = discrimination_analysis.differences_distribution(df, 'profession', 'LfaJ', 'Emp', 'top5avg', quartiles=True, numeric=True)
-cp_q_n = discrimination_analysis.control_pairs(df, cp_df, features, 'top5avg', quartiles=True, numeric=True)
-rq1_top5_plot_df = pd.concat([gd_fem_q_n, bp_na_q_n, bp_ma_q_n, bp_cn_q_n, age_q_n, city_q_n, ms_wid_q_n, ed_msc_q_n, pr_emp_q_n, cp_q_n], ignore_index=True)
+rq1_top5_plot_df = rq2_top5.subset(rq2_plot_keys).to_dataframe(quartiles=True)
 print(rq1_top5_plot_df)
 plotting.rq1_diff_boxplots(rq1_top5_plot_df)
 plotting.rq1_diff_boxplots_with_ties(rq1_top5_plot_df)
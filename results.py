@@ -0,0 +1,310 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+
+import pandas as pd
+
+ALPHA = 0.05
+
+
+@dataclass(frozen=True)
+class DistributionRecord:
+    """
+    Numeric summary of the distribution of price differences for one comparison.
+
+    Attributes:
+    - attribute (str): The attribute being compared (e.g. 'gender' or 'control pairs').
+    - pairs (str): The compared values (e.g. 'F vs M'). Empty for control pairs.
+    - n (int): The number of differences the summary is computed on.
+    - ties5 (float): The percentage of differences between -5 and +5.
+    - q05, q25, q50, q75, q95 (float): The 5th, 25th, 50th, 75th and 95th percentiles.
+    - mean (float): The average difference.
+    - sign_m (float): The M statistic of the sign test.
+    - p_value (float): The p-value of the sign test.
+    """
+    attribute: str
+    pairs: str
+    n: int
+    ties5: float
+    q05: float
+    q25: float
+    q50: float
+    q75: float
+    q95: float
+    mean: float
+    sign_m: float
+    p_value: float
+
+    @property
+    def key(self):
+        return (self.attribute, self.pairs)
+
+
+# Table columns as (header, record field, kind). The kind selects how each renderer formats the value.
+COLUMNS = [
+    ('Ties5', 'ties5', 'percent'),
+    ('.05()', 'q05', 'euro'),
+    ('.25()', 'q25', 'euro'),
+    ('.50()', 'q50', 'euro'),
+    ('.75()', 'q75', 'euro'),
+    ('.95()', 'q95', 'euro'),
+    ('m()', 'mean', 'euro'),
+    ('p-value', 'p_value', 'pvalue'),
+]
+QUARTILE_FIELDS = ('q25', 'q75')
+LATEX_PERCENT = '\\%'
+LATEX_BOLD = '\\textbf{{{}}}'
+
+
+def table_columns(quartiles=False):
+    """
+    Return the value columns of a results table.
+
+    Parameters:
+    - quartiles (bool, optional): Whether to include the 25th and 75th percentiles. Default is False.
+
+    Returns:
+    - list: The (header, field, kind) tuples of the value columns.
+    """
+    return [column for column in COLUMNS if quartiles or column[1] not in QUARTILE_FIELDS]
+
+
+class DistributionResults:
+    """
+    An ordered collection of DistributionRecord, rendered to tables on demand.
+
+    The records keep the numeric values; formatting (units, rounding, significance markers) is
+    applied only by the renderers, so the same results can be written as LaTeX for the paper and
+    as CSV/JSON for further processing.
+    """
+
+    def __init__(self, records=None):
+        self.records = list(records) if records is not None else []
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def append(self, record):
+        self.records.append(record)
+
+    def extend(self, records):
+        self.records.extend(records)
+
+    def subset(self, keys):
+        """
+        Select the records matching the given (attribute, pairs) keys, in the order of the keys.
+
+        Parameters:
+        - keys (list): The (attribute, pairs) tuples to select.
+
+        Returns:
+        - DistributionResults: The selected records.
+        """
+        by_key = {record.key: record for record in self.records}
+        return DistributionResults(by_key[key] for key in keys if key in by_key)
+
+    def to_dataframe(self, quartiles=False, formatted=False):
+        """
+        Convert the records to a DataFrame with the usual table headers.
+
+        Parameters:
+        - quartiles (bool, optional): Whether to include the 25th and 75th percentiles. Default is False.
+        - formatted (bool, optional): Whether to format the values as LaTeX strings (e.g. '12 €', '89\\%')
+          instead of keeping them numeric. Default is False.
+
+        Returns:
+        - pandas.DataFrame: One row per record; the columns are 'Attribute', 'Pairs' and the value columns.
+        """
+        headers, rows = _join([self], [''], table_columns(quartiles))
+        if formatted:
+            rows = [[_format_cell(kind, value, {}, LATEX_PERCENT, LATEX_BOLD) for kind, value in row] for row in rows]
+        else:
+            rows = [[value for _, value in row] for row in rows]
+        return pd.DataFrame(rows, columns=headers)
+
+    def render(self, fmt, others=None, suffixes=None, quartiles=False, path=None, **options):
+        """
+        Render the results with one of the registered renderers.
+
+        Parameters:
+        - fmt (str): The name of the renderer ('latex', 'csv', 'json', 'markdown' or a registered one).
+        - others (list, optional): Further DistributionResults to join side by side on (attribute, pairs),
+          as an inner join in the order of these results. Default is None.
+        - suffixes (list, optional): Header suffixes, one per joined result set (e.g. ['_top1', '_top5']).
+          Required when others is given.
+        - quartiles (bool, optional): Whether to include the 25th and 75th percentiles. Default is False.
+        - path (str, optional): If given, the rendered table is also written to this file. Default is None.
+        - **options: Renderer specific options (e.g. caption, label, labels).
+
+        Returns:
+        - str: The rendered table.
+        """
+        if fmt not in RENDERERS:
+            raise ValueError(f'Unknown format {fmt!r}, available: {", ".join(sorted(RENDERERS))}')
+        result_sets = [self] + list(others or [])
+        if suffixes is None:
+            if len(result_sets) > 1:
+                raise ValueError('suffixes are required when joining several result sets')
+            suffixes = ['']
+        elif len(suffixes) != len(result_sets):
+            raise ValueError(f'Expected {len(result_sets)} suffixes, got {len(suffixes)}')
+        headers, rows = _join(result_sets, suffixes, table_columns(quartiles))
+        text = RENDERERS[fmt](headers, rows, **options)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+
+def _join(result_sets, suffixes, columns):
+    """
+    Build the header and the typed rows of a table joining several result sets on (attribute, pairs).
+
+    Each row is a list of (kind, value) cells, so renderers can format values without parsing strings.
+    """
+    headers = ['Attribute', 'Pairs'] + [f'{header}{suffix}' for suffix in suffixes for header, _, _ in columns]
+    lookups = [{record.key: record for record in results} for results in result_sets[1:]]
+    rows = []
+    for record in result_sets[0]:
+        joined = [record] + [lookup.get(record.key) for lookup in lookups]
+        if any(r is None for r in joined):
+            continue
+        row = [('attribute', record.attribute), ('pairs', record.pairs)]
+        for r in joined:
+            row.extend((kind, getattr(r, field)) for _, field, kind in columns)
+        rows.append(row)
+    return headers, rows
+
+
+def _format_cell(kind, value, labels, percent, pvalue_format):
+    if kind == 'attribute':
+        return labels.get(value, value)
+    if kind == 'pairs':
+        return value
+    if kind == 'percent':
+        return f'{value:.0f}{percent}'
+    if kind == 'euro':
+        return f'{value:.0f} €'
+    if value < ALPHA:
+        return pvalue_format.format(f'<{ALPHA:.2f}')
+    return f'{value:.2f}'
+
+
+def render_latex(headers, rows, caption=None, label=None, labels=None, span_empty_pairs=False):
+    """
+    Render a table as a LaTeX booktabs tabular, wrapped in a table environment.
+
+    Parameters:
+    - headers (list): The column headers.
+    - rows (list): The rows of (kind, value) cells.
+    - caption (str, optional): The table caption. Default is None.
+    - label (str, optional): The table label. Default is None.
+    - labels (dict, optional): Display names for the attributes. Default is None.
+    - span_empty_pairs (bool, optional): Whether rows with an empty 'Pairs' cell (e.g. control pairs) span the
+      attribute over both columns, with a vertical rule after it. Default is False.
+
+    Returns:
+    - str: The LaTeX source.
+    """
+    labels = labels or {}
+    lines = ['\\begin{table}']
+    if caption is not None:
+        lines.append(f'\\caption{{{caption}}}')
+    if label is not None:
+        lines.append(f'\\label{{{label}}}')
+    lines.append(f'\\begin{{tabular}}{{{"l" * len(headers)}}}')
+    lines.append('\\toprule')
+    lines.append(' & '.join(headers) + ' \\\\')
+    lines.append('\\midrule')
+    for row in rows:
+        cells = [_format_cell(kind, value, labels, LATEX_PERCENT, LATEX_BOLD) for kind, value in row]
+        if span_empty_pairs and row[1][1] == '':
+            cells = [f'\\multicolumn{{2}}{{l|}}{{{cells[0]}}}'] + cells[2:]
+        lines.append(' & '.join(cells) + ' \\\\')
+    lines.append('\\bottomrule')
+    lines.append('\\end{tabular}')
+    lines.append('\\end{table}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_markdown(headers, rows, labels=None):
+    """
+    Render a table as a GitHub flavoured Markdown table.
+
+    Parameters:
+    - headers (list): The column headers.
+    - rows (list): The rows of (kind, value) cells.
+    - labels (dict, optional): Display names for the attributes. Default is None.
+
+    Returns:
+    - str: The Markdown source.
+    """
+    labels = labels or {}
+    lines = ['| ' + ' | '.join(headers) + ' |', '|' + '---|' * len(headers)]
+    for row in rows:
+        cells = [_format_cell(kind, value, labels, '%', '**{}**') for kind, value in row]
+        lines.append('| ' + ' | '.join(cells) + ' |')
+    return '\n'.join(lines) + '\n'
+
+
+def render_csv(headers, rows, sep=';'):
+    """
+    Render a table as CSV with the unformatted numeric values.
+
+    Parameters:
+    - headers (list): The column headers.
+    - rows (list): The rows of (kind, value) cells.
+    - sep (str, optional): The field separator. Default is ';', as for the input data.
+
+    Returns:
+    - str: The CSV text.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=sep, lineterminator='\n')
+    writer.writerow(headers)
+    writer.writerows([value for _, value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def render_json(headers, rows, indent=2):
+    """
+    Render a table as a JSON list of objects with the unformatted numeric values.
+
+    Parameters:
+    - headers (list): The column headers, used as keys.
+    - rows (list): The rows of (kind, value) cells.
+    - indent (int, optional): The JSON indentation. Default is 2.
+
+    Returns:
+    - str: The JSON text.
+    """
+    # NaN is not valid JSON, write it as null
+    records = [{header: (None if isinstance(value, float) and value != value else value) for header, (_, value) in zip(headers, row)} for row in rows]
+    return json.dumps(records, indent=indent, ensure_ascii=False) + '\n'
+
+
+RENDERERS = {
+    'latex': render_latex,
+    'markdown': render_markdown,
+    'csv': render_csv,
+    'json': render_json,
+}
+
+
+def register_renderer(name, renderer):
+    """
+    Register a renderer for DistributionResults.render.
+
+    Parameters:
+    - name (str): The format name.
+    - renderer (callable): A function taking (headers, rows, **options) and returning a string. Rows are
+      lists of (kind, value) cells, kind being one of 'attribute', 'pairs', 'percent', 'euro', 'pvalue'.
+    """
+    RENDERERS[name] = renderer